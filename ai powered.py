@@ -1,14 +1,30 @@
 #openai code.
+import functools
 import random
-import uuid
+import secrets
+import threading
 from datetime import datetime
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request
+import orjson
 import yaml
 import os
+from simulator_common import locked
+
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeLoader, SafeDumper
 import openai
 
+class ORJSONResponse(Response):
+    """Response whose body is JSON encoded by orjson."""
+    default_mimetype = "application/json"
+
 app = Flask(__name__)
 CONFIG_FILE = "config.yaml"
+REQUIRED_FIELDS = frozenset(("method", "request", "response"))
+_config_cache = {"mtime": None, "data": None}  # Parsed config, valid while the file's mtime is unchanged
+_config_lock = threading.RLock()
 
 openai.api_key = "your-openai-api-key"  # Replace with your actual OpenAI API key
 
@@ -19,17 +35,32 @@ def create_empty_yaml():
             yaml.dump({"endpoints": {}}, f)
 
 def read_config():
-    create_empty_yaml()
-    with open(CONFIG_FILE, "r") as f:
-        return yaml.safe_load(f) or {"endpoints": {}}
+    with _config_lock:
+        create_empty_yaml()
+        mtime = os.stat(CONFIG_FILE).st_mtime_ns
+        if mtime != _config_cache["mtime"]:
+            with open(CONFIG_FILE, "r") as f:
+                _config_cache["data"] = yaml.load(f, Loader=SafeLoader) or {"endpoints": {}}
+            _config_cache["mtime"] = mtime
+        return _config_cache["data"]
 
 def write_config(config):
-    with open(CONFIG_FILE, "w") as f:
-        yaml.dump(config, f, default_flow_style=False)
+    with _config_lock:
+        with open(CONFIG_FILE, "w") as f:
+            yaml.dump(config, f, Dumper=SafeDumper, default_flow_style=False)
+        _config_cache["data"] = config
+        _config_cache["mtime"] = os.stat(CONFIG_FILE).st_mtime_ns
+
+with_config_lock = locked(_config_lock)
 
+@functools.lru_cache(maxsize=4096)
 def normalize_path(path):
     return '/' + path.strip('/')
 
+def json_response(payload):
+    """Serialize a payload with orjson into a JSON response."""
+    return ORJSONResponse(orjson.dumps(payload))
+
 # def generate_dynamic_value(schema):
 #     """Use OpenAI to generate structured random responses based on the schema."""
 #     prompt = f"Generate a JSON response matching this schema: {schema}"
@@ -41,18 +72,18 @@ def normalize_path(path):
 #     return response["choices"][0]["message"]["content"]
 
 @app.route('/olbb-simulator/register', methods=['POST'])
+@with_config_lock
 def register_endpoint():
     """Registers a new endpoint with the actual response schema."""
     try:
         data = request.get_json()
-        required_fields = ["method", "request", "response"]
-        if not all(field in data for field in required_fields):
-            return jsonify({"status": "error", "message": f"Missing required fields. Required: {required_fields}"}), 400
+        if not REQUIRED_FIELDS.issubset(data):
+            return json_response({"status": "error", "message": f"Missing required fields. Required: {sorted(REQUIRED_FIELDS)}"}), 400
 
         path = normalize_path(data.get("path", ""))
         config = read_config()
         method = data["method"].upper()
-        endpoint_id = str(uuid.uuid4())
+        endpoint_id = secrets.token_hex(8)
 
         if path not in config["endpoints"]:
             config["endpoints"][path] = {}
@@ -66,52 +97,58 @@ def register_endpoint():
         }
         write_config(config)
 
-        return jsonify({"status": "success", "message": "New endpoint registered successfully", "endpoint_id": endpoint_id}), 200
+        return json_response({"status": "success", "message": "New endpoint registered successfully", "endpoint_id": endpoint_id}), 200
     except Exception as e:
-        return jsonify({"status": "error", "message": str(e)}), 500
+        return json_response({"status": "error", "message": str(e)}), 500
 
 @app.route('/olbb-simulator/<path:path>', methods=['POST'])
+@with_config_lock
 def handle_dynamic_request(path):
     """Handles requests and generates dynamic responses based on stored schema."""
     try:
         config = read_config()
         normalized_path = normalize_path(path)
 
-        if normalized_path in config["endpoints"]:
-            endpoint_id = str(uuid.uuid4())
-            for endpoint in config["endpoints"][normalized_path].values():
-                response_schema = endpoint.get("response_schema", {})
-                dynamic_response = generate_dynamic_value(response_schema)
-                config["endpoints"][normalized_path][endpoint_id] = {
-                    "id": endpoint_id,
-                    "method": "POST",
-                    "response": dynamic_response,
-                    "created_at": str(datetime.now())
-                }
-                write_config(config)
-                return jsonify(dynamic_response), 200
-
-        return jsonify({"status": "error", "message": f"No endpoint found for {normalized_path}"}), 404
+        endpoints = config["endpoints"].get(normalized_path)
+        if endpoints:
+            # The first endpoint registered for the path holds its response schema
+            endpoint = next(iter(endpoints.values()))
+            response_schema = endpoint.get("response_schema", {})
+            dynamic_response = generate_dynamic_value(response_schema)
+            endpoint_id = secrets.token_hex(8)
+            endpoints[endpoint_id] = {
+                "id": endpoint_id,
+                "method": "POST",
+                "response": dynamic_response,
+                "created_at": str(datetime.now())
+            }
+            write_config(config)
+            return json_response(dynamic_response), 200
+
+        return json_response({"status": "error", "message": f"No endpoint found for {normalized_path}"}), 404
     except Exception as e:
-        return jsonify({"status": "error", "message": str(e)}), 500
+        return json_response({"status": "error", "message": str(e)}), 500
 
 @app.route('/olbb-simulator/<path:path>', methods=['GET'])
+@with_config_lock
 def get_all_endpoints(path):
     config = read_config()
     normalized_path = normalize_path(path)
     if normalized_path in config["endpoints"]:
-        return jsonify({"status": "success", "endpoints": config["endpoints"][normalized_path]}), 200
-    return jsonify({"status": "error", "message": "No endpoints found for the given path"}), 404
+        return json_response({"status": "success", "endpoints": config["endpoints"][normalized_path]}), 200
+    return json_response({"status": "error", "message": "No endpoints found for the given path"}), 404
 
 @app.route('/olbb-simulator/<path:path>/<endpoint_id>', methods=['GET'])
+@with_config_lock
 def get_endpoint(path, endpoint_id):
     config = read_config()
     normalized_path = normalize_path(path)
     if normalized_path in config["endpoints"] and endpoint_id in config["endpoints"][normalized_path]:
-        return jsonify({"status": "success", "endpoint": config["endpoints"][normalized_path][endpoint_id]}), 200
-    return jsonify({"status": "error", "message": "Endpoint not found"}), 404
+        return json_response({"status": "success", "endpoint": config["endpoints"][normalized_path][endpoint_id]}), 200
+    return json_response({"status": "error", "message": "Endpoint not found"}), 404
 
 @app.route('/olbb-simulator/<path:path>/<endpoint_id>', methods=['PUT'])
+@with_config_lock
 def update_endpoint(path, endpoint_id):
     try:
         data = request.get_json()
@@ -119,7 +156,7 @@ def update_endpoint(path, endpoint_id):
         normalized_path = normalize_path(path)
         
         if normalized_path not in config["endpoints"] or endpoint_id not in config["endpoints"][normalized_path]:
-            return jsonify({"status": "error", "message": "Endpoint not found"}), 404
+            return json_response({"status": "error", "message": "Endpoint not found"}), 404
         
         endpoint = config["endpoints"][normalized_path][endpoint_id]
         for key, value in data.items():
@@ -127,11 +164,12 @@ def update_endpoint(path, endpoint_id):
         endpoint["updated_at"] = str(datetime.now())
         write_config(config)
 
-        return jsonify({"status": "success", "message": "Endpoint updated successfully", "endpoint": endpoint}), 200
+        return json_response({"status": "success", "message": "Endpoint updated successfully", "endpoint": endpoint}), 200
     except Exception as e:
-        return jsonify({"status": "error", "message": str(e)}), 500
+        return json_response({"status": "error", "message": str(e)}), 500
 
 @app.route('/olbb-simulator/<path:path>/<endpoint_id>', methods=['DELETE'])
+@with_config_lock
 def delete_endpoint(path, endpoint_id):
     config = read_config()
     normalized_path = normalize_path(path)
@@ -141,14 +179,16 @@ def delete_endpoint(path, endpoint_id):
         if not config["endpoints"][normalized_path]:
             del config["endpoints"][normalized_path]
         write_config(config)
-        return jsonify({"status": "success", "message": "Endpoint deleted successfully", "deleted_endpoint": deleted_endpoint}), 200
-    return jsonify({"status": "error", "message": "Endpoint not found"}), 404
-
-if __name__ == '__main__':
-    app.run(debug=True)
-
-        return jsonify({"status": "success", "message": "Endpoint deleted successfully", "deleted_endpoint": deleted_endpoint}), 200
-    return jsonify({"status": "error", "message": "Endpoint not found"}), 404
+        return json_response({"status": "success", "message": "Endpoint deleted successfully", "deleted_endpoint": deleted_endpoint}), 200
+    return json_response({"status": "error", "message": "Endpoint not found"}), 404
 
 if __name__ == '__main__':
-    app.run(debug=True)
+    if os.environ.get('FLASK_DEBUG') == '1':
+        app.run(debug=True, threaded=True)
+    else:
+        try:
+            from waitress import serve
+        except ImportError:
+            app.run(threaded=True)
+        else:
+            serve(app, host='127.0.0.1', port=5000, threads=16)
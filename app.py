@@ -1,145 +1,315 @@
-from flask import Flask, request, jsonify
+import asyncio
+from collections import defaultdict
+import hashlib
+import keyword
+import mmap
+import pickle
+import re
+import dataclasses
+import fastjsonschema
+import functools
+import glob
+from quart import Quart, Response, request
+from hypercorn.asyncio import serve
+from hypercorn.config import Config
+import orjson
+import uvloop
 import yaml
 import os
-from typing import Dict, Any
+import sys
+from typing import Dict, Any, Callable, List, Optional
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+SPEC_CACHE_DIR = ".spec_cache"  # Pickled parses of spec files, next to the spec
+_PATH_PARAM_RE = re.compile(r'\{([^}]+)\}')
+# OpenAPI-only formats that JSON Schema validators do not know about
+_OPENAPI_FORMATS = {name: (lambda value: True) for name in ('int32', 'int64', 'float', 'double', 'byte', 'binary', 'password')}
+# Default of entity fields the client never sent, so they are left out of replies
+_UNSET = object()
+# Operation keys of an OpenAPI path item; the rest (parameters, summary, servers) are not routes
+_HTTP_METHODS = frozenset(('get', 'put', 'post', 'delete', 'patch', 'options', 'head', 'trace'))
+
+
+class JSONResponse(Response):
+    """Response class whose content type is JSON by default."""
+    default_mimetype = 'application/json'
+
+
+def _reply(payload: Any, status: int) -> JSONResponse:
+    """Build a JSON response serialized with orjson."""
+    return JSONResponse(orjson.dumps(payload), status=status)
+
+
+async def _json_body() -> Any:
+    """Parse the JSON request body with orjson, or return None for non-JSON requests."""
+    if not request.is_json:
+        return None
+    return orjson.loads(await request.get_data(cache=False))
+
+
+def _catch_errors(handler):
+    """Turn exceptions raised by a route handler into a 400 JSON response."""
+    @functools.wraps(handler)
+    async def wrapper(*args, **kwargs):
+        try:
+            return await handler(*args, **kwargs)
+        except Exception as e:
+            return _reply({"error": str(e)}, 400)
+    return wrapper
+
+
+def _intern_spec(node: Any) -> Any:
+    """Recursively intern mapping keys and required/enum strings of a spec."""
+    if isinstance(node, dict):
+        interned = {}
+        for key, value in node.items():
+            if isinstance(key, str):
+                key = sys.intern(key)
+            if key in ('required', 'enum') and isinstance(value, list):
+                value = [sys.intern(item) if isinstance(item, str) else item for item in value]
+            interned[key] = _intern_spec(value)
+        return interned
+    if isinstance(node, list):
+        return [_intern_spec(item) for item in node]
+    return node
 
 
 class GenericAPIHandler:
     """Handles CRUD operations for any entity dynamically."""
     def __init__(self):
-        self.store: Dict[str, Dict[int, Any]] = {}
-        self.id_counters: Dict[str, int] = {}
+        self.store: Dict[str, Dict[int, Any]] = defaultdict(dict)
+        self.id_counters: Dict[str, int] = defaultdict(lambda: 1)
+        self.entity_classes: Dict[str, type] = {}
+        self.list_cache: Dict[str, bytes] = {}
+
+    def register_entity_schema(self, entity_type: str, schema: Dict) -> None:
+        """Generate a slotted dataclass used to store entities of this type."""
+        field_names = ['id'] + [name for name in schema.get('properties', {}) if name != 'id']
+        if not all(name.isidentifier() and not keyword.iskeyword(name) for name in field_names):
+            return
+        self.entity_classes[entity_type] = dataclasses.make_dataclass(
+            entity_type.title(),
+            [(name, Any, dataclasses.field(default=_UNSET)) for name in field_names],
+            slots=True,
+        )
+
+    def to_entity(self, entity_type: str, data: Dict) -> Any:
+        """Convert a request body to the stored entity representation."""
+        entity_class = self.entity_classes.get(entity_type)
+        if entity_class is None or not data.keys() <= entity_class.__dataclass_fields__.keys():
+            return data
+        return entity_class(**data)
+
+    @staticmethod
+    def to_dict(entity: Any) -> Dict:
+        """Convert a stored entity back to a plain dict of the fields that were set."""
+        if not dataclasses.is_dataclass(entity):
+            return entity
+        values = {name: getattr(entity, name) for name in entity.__slots__}
+        return {name: value for name, value in values.items() if value is not _UNSET}
 
     def get_entity_type(self, path: str) -> str:
         """Extract entity type from the path."""
         return path.split('/')[1] if len(path.split('/')) > 1 else 'default'
 
-    def get_or_create_store(self, entity_type: str) -> Dict[int, Any]:
-        """Get or create a store for the entity type."""
-        if entity_type not in self.store:
-            self.store[entity_type] = {}
-            self.id_counters[entity_type] = 1
-        return self.store[entity_type]
-
     def create(self, entity_type: str, data: Dict) -> tuple:
         """Create a new entity."""
-        store = self.get_or_create_store(entity_type)
+        store = self.store[entity_type]
         entity_id = self.id_counters[entity_type]
         data['id'] = entity_id
-        store[entity_id] = data
+        store[entity_id] = self.to_entity(entity_type, data)
         self.id_counters[entity_type] += 1
+        self.list_cache.pop(entity_type, None)
         return {"data": data}, 201
 
+    def create_many(self, entity_type: str, items: List[Dict]) -> tuple:
+        """Create several entities from a bulk request."""
+        created = [self.create(entity_type, data)[0]["data"] for data in items]
+        return {"data": created}, 201
+
     def get_all(self, entity_type: str) -> tuple:
-        """Get all entities."""
-        store = self.get_or_create_store(entity_type)
-        entities = list(store.values())
-        return {"data": entities}, 200
+        """Get all entities as a serialized payload, reused until the next write."""
+        body = self.list_cache.get(entity_type)
+        if body is None:
+            store = self.store[entity_type]
+            body = self.list_cache[entity_type] = orjson.dumps({"data": [self.to_dict(entity) for entity in store.values()]})
+        return body, 200
 
     def get_one(self, entity_type: str, entity_id: int) -> tuple:
         """Get a single entity."""
-        store = self.get_or_create_store(entity_type)
+        store = self.store[entity_type]
         entity = store.get(entity_id)
         if entity is None:
             return {"error": f"{entity_type} not found"}, 404
-        return {"data": entity}, 200
+        return {"data": self.to_dict(entity)}, 200
 
     def update(self, entity_type: str, entity_id: int, data: Dict) -> tuple:
         """Update an existing entity."""
-        store = self.get_or_create_store(entity_type)
+        store = self.store[entity_type]
         if entity_id not in store:
             return {"error": f"{entity_type} not found"}, 404
         data['id'] = entity_id
-        store[entity_id] = data
+        store[entity_id] = self.to_entity(entity_type, data)
+        self.list_cache.pop(entity_type, None)
         return {"data": data}, 200
 
     def delete(self, entity_type: str, entity_id: int) -> tuple:
         """Delete an entity."""
-        store = self.get_or_create_store(entity_type)
+        store = self.store[entity_type]
         if entity_id not in store:
             return {"error": f"{entity_type} not found"}, 404
         deleted_entity = store.pop(entity_id)
-        return {"data": deleted_entity}, 200
+        self.list_cache.pop(entity_type, None)
+        return {"data": self.to_dict(deleted_entity)}, 200
 
 
 class OpenAPIFlask:
-    """Dynamic Flask application based on OpenAPI specifications."""
+    """Dynamic Quart (ASGI) application based on OpenAPI specifications."""
     def __init__(self, spec_file: str):
-        self.app = Flask(__name__)
+        self.app = Quart(__name__)
         self.handler = GenericAPIHandler()
         self.spec = self.load_spec(spec_file)
         self.register_routes()
 
     def load_spec(self, spec_file: str) -> Dict:
-        """Load and parse the OpenAPI specification."""
+        """Load and parse the OpenAPI specification, reusing a cached parse if unchanged."""
         if not os.path.exists(spec_file):
             raise FileNotFoundError(f"Specification file {spec_file} not found.")
-        with open(spec_file, 'r') as file:
-            return yaml.safe_load(file)
+        spec_path = os.path.abspath(spec_file)
+        stat = os.stat(spec_path)
+        cache_dir = os.path.join(os.path.dirname(spec_path), SPEC_CACHE_DIR)
+        cache_prefix = os.path.join(cache_dir, hashlib.md5(spec_path.encode()).hexdigest())
+        cache_path = f"{cache_prefix}.{stat.st_mtime_ns}.{stat.st_size}.pkl"
+        try:
+            with open(cache_path, 'rb') as file:
+                return _intern_spec(pickle.load(file))
+        except Exception:
+            pass  # No usable cache entry (missing, truncated or unpicklable); parse the spec instead
+        with open(spec_path, 'rb') as file:
+            if stat.st_size == 0:
+                spec = None
+            else:
+                # Let libyaml read straight from the mapped pages instead of a str copy
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    spec = yaml.load(mapped, Loader=SafeLoader)
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            for stale_path in glob.glob(f"{cache_prefix}.*.pkl"):
+                os.remove(stale_path)
+            # Write beside the entry and swap it in, so a crash never leaves a truncated cache
+            with open(f"{cache_path}.tmp", 'wb') as file:
+                pickle.dump(spec, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(f"{cache_path}.tmp", cache_path)
+        except OSError:
+            pass  # The cache is optional; a read-only spec directory just skips it
+        return _intern_spec(spec)
+
+    def resolve_schema_ref(self, schema: Dict) -> Dict:
+        """Resolve a local '#/...' $ref against the loaded spec."""
+        if '$ref' not in schema:
+            return schema
+        resolved = self.spec
+        for part in schema['$ref'].lstrip('#/').split('/'):
+            resolved = resolved.get(part, {})
+        return resolved
 
-    def validate_request_body(self, data: Dict, schema: Dict) -> None:
-        """Validate request body against OpenAPI schema."""
-        required_fields = schema.get('required', [])
-        for field in required_fields:
-            if field not in data:
-                raise ValueError(f"Missing required field: {field}")
+    def compile_validator(self, schema: Dict) -> Callable[[Any], Any]:
+        """Compile a request schema into a fastjsonschema validator function."""
+        # Carry the spec's components so nested '#/components/...' refs resolve
+        return fastjsonschema.compile(
+            {**schema, 'components': self.spec.get('components', {})},
+            formats=_OPENAPI_FORMATS,
+        )
+
+    def validate_bulk_request_body(self, rows: List[Dict], validate: Callable[[Any], Any]) -> None:
+        """Validate every row of a bulk request body in a single pass."""
+        invalid_rows = []
+        for index, row in enumerate(rows):
+            try:
+                validate(row)
+            except fastjsonschema.JsonSchemaException:
+                invalid_rows.append(index)
+        if invalid_rows:
+            raise ValueError(f"Invalid rows: {invalid_rows}")
 
     def register_routes(self) -> None:
         """Register routes dynamically based on OpenAPI spec."""
         paths = self.spec.get('paths', {})
         for path, methods in paths.items():
-            flask_path = path.replace('{', '<int:id>').replace('}', '')  # Convert OpenAPI path to Flask format with type
+            # Convert OpenAPI path to Flask format, keeping the spec's parameter names
+            flask_path = _PATH_PARAM_RE.sub(lambda match: f'<int:{match.group(1)}>', path)
+            path_params = _PATH_PARAM_RE.findall(path)
+            id_param = path_params[-1] if path_params else None
             for method, operation in methods.items():
-                self.register_route(flask_path, method, operation)
+                if method not in _HTTP_METHODS:
+                    continue
+                self.register_route(flask_path, method, operation, id_param)
 
-    def register_route(self, path: str, method: str, operation: Dict) -> None:
+    def register_route(self, path: str, method: str, operation: Dict, id_param: Optional[str] = None) -> None:
         """Register a single route."""
-        def route_handler(**kwargs):
-            entity_type = path.split('/')[1]
-            try:
-                if method == 'get' and 'id' in kwargs:
-                    # Get a single entity by ID
-                    entity_id = kwargs['id']
-                    response, status_code = self.handler.get_one(entity_type, entity_id)
-                    return jsonify(response), status_code
-                elif method == 'get':
-                    # Get all entities
-                    response, status_code = self.handler.get_all(entity_type)
-                    return jsonify(response), status_code
-                elif method == 'post':
-                    # Create an entity
-                    data = request.get_json()
-                    schema = operation.get('requestBody', {}).get('content', {}).get('application/json', {}).get('schema', {})
-                    self.validate_request_body(data, schema)
-                    return jsonify(self.handler.create(entity_type, data)[0]), 201
-                elif method == 'put':
-                    # Update an entity
-                    data = request.get_json()
-                    entity_id = kwargs['id']
-                    schema = operation.get('requestBody', {}).get('content', {}).get('application/json', {}).get('schema', {})
-                    self.validate_request_body(data, schema)
-                    response, status_code = self.handler.update(entity_type, entity_id, data)
-                    return jsonify(response), status_code
-                elif method == 'delete':
-                    # Delete an entity
-                    entity_id = kwargs['id']
-                    response, status_code = self.handler.delete(entity_type, entity_id)
-                    return jsonify(response), status_code
-                else:
-                    return jsonify({"error": "Method not supported"}), 405
-            except Exception as e:
-                return jsonify({"error": str(e)}), 400
+        schema = self.resolve_schema_ref(
+            operation.get('requestBody', {}).get('content', {}).get('application/json', {}).get('schema', {})
+        )
+        # Only the collection route describes the entity; nested POSTs carry other schemas
+        if method == 'post' and id_param is None:
+            self.handler.register_entity_schema(path.split('/')[1], schema)
+        # Only routes that read a body need a validator; it is built once, at registration
+        validate = None
+        if method in ('post', 'put'):
+            validate = self.compile_validator(schema)
+
+        entity_type = path.split('/')[1]
+        handler = self.handler
+
+        async def get_one(**params):
+            return _reply(*handler.get_one(entity_type, params[id_param]))
+
+        async def get_all(**params):
+            # The listing comes back already serialized, so skip _reply's dumps
+            body, status = handler.get_all(entity_type)
+            return JSONResponse(body, status=status)
+
+        async def create(**params):
+            # Create an entity, or several from a bulk list body
+            data = await _json_body()
+            if isinstance(data, list):
+                self.validate_bulk_request_body(data, validate)
+                return _reply(*handler.create_many(entity_type, data))
+            validate(data)
+            return _reply(*handler.create(entity_type, data))
+
+        async def update(**params):
+            data = await _json_body()
+            validate(data)
+            return _reply(*handler.update(entity_type, params[id_param], data))
+
+        async def delete(**params):
+            return _reply(*handler.delete(entity_type, params[id_param]))
+
+        # Pick the specialized view once so requests never branch on the method
+        if method == 'get':
+            view = get_one if id_param else get_all
+        else:
+            view = {'post': create, 'put': update, 'delete': delete}.get(method)
+        if view is None:
+            return
 
         endpoint = f"{method}_{path}"
-        self.app.add_url_rule(path, endpoint, route_handler, methods=[method.upper()])
+        self.app.add_url_rule(path, endpoint, _catch_errors(view), methods=[method.upper()])
 
-    def run(self, *args, **kwargs):
-        """Run the Flask application."""
-        self.app.run(*args, **kwargs)
+    def run(self, host: str = '127.0.0.1', port: int = 5000) -> None:
+        """Serve the application with Hypercorn on a uvloop event loop."""
+        config = Config()
+        config.bind = [f"{host}:{port}"]
+        with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+            runner.run(serve(self.app, config))
 
 
 if __name__ == '__main__':
-    import sys
     spec_file = sys.argv[1] if len(sys.argv) > 1 else 'openapi.yaml'
     app = OpenAPIFlask(spec_file)
-    app.run(debug=True, port=5000)
+    app.run(port=5000)
@@ -1,11 +1,29 @@
-import uuid
-from datetime import datetime
-from flask import Flask, request, jsonify
+import functools
+import threading
+from flask import Flask, Response, request
+import orjson
 import yaml
 import os
+from simulator_common import fast_id, locked, now_str
+from template_values import compile_dynamic_value
+
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeLoader, SafeDumper
 
 app = Flask(__name__)
 CONFIG_FILE = "config.yaml"
+REQUIRED_FIELDS = frozenset(("request", "response"))
+JOURNAL_FILE = "config.journal"
+JOURNAL_LIMIT = 1000  # Journal records to keep before compacting them into CONFIG_FILE
+
+# The config lives in memory; mutations are appended to the journal and
+# periodically compacted into a fresh CONFIG_FILE snapshot
+_config = None
+_journal = None
+_journal_records = 0
+_config_lock = threading.RLock()
 
 def create_empty_yaml():
     if not os.path.exists(CONFIG_FILE):
@@ -13,28 +31,123 @@ def create_empty_yaml():
             yaml.dump({"endpoints": {}}, f)
 
 def read_config():
-    create_empty_yaml()
-    with open(CONFIG_FILE, "r") as f:
-        return yaml.safe_load(f) or {"endpoints": {}}
+    global _config, _journal, _journal_records
+    with _config_lock:
+        if _config is None:
+            create_empty_yaml()
+            with open(CONFIG_FILE, "r") as f:
+                config = yaml.load(f, Loader=SafeLoader) or {"endpoints": {}}
+            # Replay the mutations recorded since the last snapshot
+            valid_length = 0
+            if os.path.exists(JOURNAL_FILE):
+                with open(JOURNAL_FILE, "rb") as f:
+                    for line in f:
+                        # A crash mid-append leaves a torn last line; drop it instead of failing every request
+                        if not line.endswith(b"\n"):
+                            break
+                        try:
+                            record = orjson.loads(line)
+                        except orjson.JSONDecodeError:
+                            break
+                        apply_record(config, record)
+                        _journal_records += 1
+                        valid_length += len(line)
+            _journal = open(JOURNAL_FILE, "ab")
+            _journal.truncate(valid_length)
+            _config = config
+        return _config
+
+def apply_record(config, record):
+    """Replay one journaled mutation onto the config."""
+    path = record["path"]
+    if record["op"] == "drop":
+        config["endpoints"].pop(path, None)
+        return
+    instances = config["endpoints"].setdefault(path, {"instances": []})["instances"]
+    if record["op"] == "add":
+        instances.append(record["instance"])
+        return
+    for i, instance in enumerate(instances):
+        if instance["id"] == record["id"]:
+            if record["op"] == "del":
+                del instances[i]
+            else:
+                instances[i] = record["instance"]
+            return
 
 def write_config(config):
-    with open(CONFIG_FILE, "w") as f:
-        yaml.dump(config, f, default_flow_style=False)
+    """Write a full snapshot of the config and empty the journal."""
+    global _journal_records
+    with _config_lock:
+        tmp_file = CONFIG_FILE + ".tmp"
+        with open(tmp_file, "w") as f:
+            yaml.dump(config, f, Dumper=SafeDumper, default_flow_style=False)
+        os.replace(tmp_file, CONFIG_FILE)
+        if _journal is not None:
+            _journal.truncate(0)
+        _journal_records = 0
+
+def journal(config, record):
+    """Append one mutation record to the journal, compacting it once it grows long."""
+    global _journal_records
+    with _config_lock:
+        _journal.write(orjson.dumps(record) + b"\n")
+        _journal.flush()
+        _journal_records += 1
+        if _journal_records >= JOURNAL_LIMIT:
+            write_config(config)
+
+with_config_lock = locked(_config_lock)
 
+@functools.lru_cache(maxsize=4096)
 def normalize_path(path):
     return '/' + path.strip('/')
 
+# Compiled request/response generators per path, tagged with their template's id; updates drop them
+_template_generators = {}
+
+def get_template_generators(path, template_instance):
+    """Get the compiled generators for a path's template instance, compiling them on first use."""
+    cached = _template_generators.get(path)
+    if cached is None or cached[0] != template_instance["id"]:
+        cached = _template_generators[path] = (
+            template_instance["id"],
+            compile_dynamic_value(template_instance["request"]),
+            compile_dynamic_value(template_instance["response"]),
+        )
+    return cached[1], cached[2]
+
+def json_body():
+    """Parse a JSON request body with orjson, reading the body only once."""
+    if request.mimetype != "application/json":
+        return request.on_json_loading_failed(None)
+    data = request.get_data(cache=False)
+    return orjson.loads(data) if data else None
+
+def json_response(payload):
+    """Serialize a payload with orjson into a JSON response."""
+    return Response(orjson.dumps(payload), mimetype="application/json")
+
+@functools.lru_cache(maxsize=None)
+def _status_body(status, message):
+    return orjson.dumps({"status": status, "message": message})
+
+def status_response(status, message):
+    """Build a fixed status/message JSON response, serializing each distinct pair only once."""
+    return Response(_status_body(status, message), mimetype="application/json")
+
 @app.route('/olbb-simulator/<path:path>', methods=['POST'])
+@with_config_lock
 def register_endpoint(path):
     """Registers a new endpoint with request and response."""
     try:
-        data = request.get_json()
+        data = json_body()
         config = read_config()
         normalized_path = normalize_path(path)
         method = data.get("method", "POST").upper()
 
-        if "request" not in data or "response" not in data:
-            return jsonify({"status": "error", "message": "Missing request or response"}), 400
+        if not REQUIRED_FIELDS.issubset(data):
+            return status_response("error", "Missing request or response"), 400
 
         if normalized_path not in config["endpoints"]:
             config["endpoints"][normalized_path] = {"instances": []}
@@ -43,23 +156,24 @@ def register_endpoint(path):
         
         for instance in instances:
             if instance["request"] == data["request"] and instance["response"] == data["response"]:
-                return jsonify({"status": "error", "message": "Duplicate request and response"}), 400
+                return status_response("error", "Duplicate request and response"), 400
         
         new_instance = {
-            "id": str(uuid.uuid4()),
+            "id": fast_id(),
             "method": method,
             "request": data["request"],
             "response": data["response"],
-            "created_at": str(datetime.now())
+            "created_at": now_str()
         }
         instances.append(new_instance)
-        write_config(config)
+        journal(config, {"op": "add", "path": normalized_path, "instance": new_instance})
 
-        return jsonify({"status": "success", "message": "New endpoint registered successfully"}), 200
+        return status_response("success", "New endpoint registered successfully"), 200
     except Exception as e:
-        return jsonify({"status": "error", "message": str(e)}), 500
+        return json_response({"status": "error", "message": str(e)}), 500
 
 @app.route('/olbb-simulator/<path:path>', methods=['GET'])
+@with_config_lock
 def get_all_endpoints(path):
     """Fetches all endpoint data for the given path."""
     config = read_config()
@@ -72,10 +186,11 @@ def get_all_endpoints(path):
             "request": instance["request"],
             "response": instance["response"]
         } for instance in instances]
-        return jsonify({"status": "success", "message": f"{len(instances)} endpoints found", "endpoints": response_data}), 200
-    return jsonify({"status": "error", "message": "No endpoints found for the given path"}), 404
+        return json_response({"status": "success", "message": f"{len(instances)} endpoints found", "endpoints": response_data}), 200
+    return status_response("error", "No endpoints found for the given path"), 404
 
 @app.route('/olbb-simulator/<path:path>/<endpoint_id>', methods=['GET'])
+@with_config_lock
 def get_endpoint(path, endpoint_id):
     """Fetches a specific endpoint by ID."""
     config = read_config()
@@ -83,14 +198,15 @@ def get_endpoint(path, endpoint_id):
     if normalized_path in config["endpoints"]:
         for instance in config["endpoints"][normalized_path].get("instances", []):
             if instance["id"] == endpoint_id:
-                return jsonify({"status": "success", "endpoint": instance}), 200
-    return jsonify({"status": "error", "message": "Endpoint not found"}), 404
+                return json_response({"status": "success", "endpoint": instance}), 200
+    return status_response("error", "Endpoint not found"), 404
 
 @app.route('/olbb-simulator/<path:path>/<endpoint_id>', methods=['PUT'])
+@with_config_lock
 def update_endpoint(path, endpoint_id):
     """Updates an existing endpoint."""
     try:
-        data = request.get_json()
+        data = json_body()
         config = read_config()
         normalized_path = normalize_path(path)
         
@@ -98,25 +214,29 @@ def update_endpoint(path, endpoint_id):
             for instance in config["endpoints"][normalized_path].get("instances", []):
                 if instance["id"] == endpoint_id:
                     instance.update(data)
-                    instance["updated_at"] = str(datetime.now())
-                    write_config(config)
-                    return jsonify({"status": "success", "message": "Endpoint updated successfully", "endpoint": instance}), 200
-        return jsonify({"status": "error", "message": "Endpoint not found"}), 404
+                    instance["updated_at"] = now_str()
+                    _template_generators.pop(normalized_path, None)
+                    journal(config, {"op": "put", "path": normalized_path, "id": endpoint_id, "instance": instance})
+                    return json_response({"status": "success", "message": "Endpoint updated successfully", "endpoint": instance}), 200
+        return status_response("error", "Endpoint not found"), 404
     except Exception as e:
-        return jsonify({"status": "error", "message": str(e)}), 500
+        return json_response({"status": "error", "message": str(e)}), 500
 
 @app.route('/olbb-simulator/<path:path>', methods=['DELETE'])
+@with_config_lock
 def delete_all_endpoints(path):
     """Deletes all instances for a given path."""
     config = read_config()
     normalized_path = normalize_path(path)
     if normalized_path in config["endpoints"]:
         del config["endpoints"][normalized_path]
-        write_config(config)
-        return jsonify({"status": "success", "message": "All endpoints deleted for the given path"}), 200
-    return jsonify({"status": "error", "message": "No endpoints found for the given path"}), 404
+        _template_generators.pop(normalized_path, None)
+        journal(config, {"op": "drop", "path": normalized_path})
+        return status_response("success", "All endpoints deleted for the given path"), 200
+    return status_response("error", "No endpoints found for the given path"), 404
 
 @app.route('/olbb-simulator/<path:path>/<endpoint_id>', methods=['DELETE'])
+@with_config_lock
 def delete_endpoint(path, endpoint_id):
     """Deletes a specific endpoint instance."""
     config = read_config()
@@ -127,17 +247,26 @@ def delete_endpoint(path, endpoint_id):
         for i, instance in enumerate(instances):
             if instance["id"] == endpoint_id:
                 del instances[i]
-                write_config(config)
-                return jsonify({"status": "success", "message": "Endpoint deleted successfully"}), 200
-    return jsonify({"status": "error", "message": "Endpoint not found"}), 404
+                journal(config, {"op": "del", "path": normalized_path, "id": endpoint_id})
+                return status_response("success", "Endpoint deleted successfully"), 200
+    return status_response("error", "Endpoint not found"), 404
 
 if __name__ == '__main__':
-    app.run(debug=True)
+    if os.environ.get('FLASK_DEBUG') == '1':
+        app.run(debug=True, threaded=True)
+    else:
+        try:
+            from waitress import serve
+        except ImportError:
+            app.run(threaded=True)
+        else:
+            serve(app, host='127.0.0.1', port=5000, threads=16)
 
 
 
 #ai operation
 @app.route('/olbb-simulator/ai/<path:path>', methods=['POST'])
+@with_config_lock
 def handle_dynamic_request_response(path):
     """Handles request and response schema-based dynamic generation and stores results."""
     try:
@@ -145,7 +274,7 @@ def handle_dynamic_request_response(path):
         normalized_path = normalize_path(path)
 
         if normalized_path not in config["endpoints"]:
-            return jsonify({
+            return json_response({
                 "status": "error", 
                 "message": "No endpoints found for the given path"
             }), 404
@@ -153,7 +282,7 @@ def handle_dynamic_request_response(path):
         # Get instances for the path
         instances = config["endpoints"][normalized_path].get("instances", [])
         if not instances:
-            return jsonify({
+            return json_response({
                 "status": "error", 
                 "message": "No request/response schemas found for this endpoint"
             }), 404
@@ -161,24 +290,25 @@ def handle_dynamic_request_response(path):
         # Use the first instance's schema as template
         template_instance = instances[0]
         
-        # Generate dynamic values based on the template schemas
-        generated_request = generate_dynamic_value(template_instance["request"])
-        generated_response = generate_dynamic_value(template_instance["response"])
+        # Generate dynamic values from the template's compiled generators
+        generate_request, generate_response = get_template_generators(normalized_path, template_instance)
+        generated_request = generate_request()
+        generated_response = generate_response()
 
         # Create new instance with generated values
         new_instance = {
-            "id": str(uuid.uuid4()),
+            "id": fast_id(),
             "method": "POST",
             "request": generated_request,
             "response": generated_response,
-            "created_at": str(datetime.now())
+            "created_at": now_str()
         }
 
         # Add to instances
         instances.append(new_instance)
-        write_config(config)
+        journal(config, {"op": "add", "path": normalized_path, "instance": new_instance})
 
-        return jsonify({
+        return json_response({
             "status": "success",
             "data": {
                 "generated_request": generated_request,
@@ -188,7 +318,7 @@ def handle_dynamic_request_response(path):
         }), 200
 
     except Exception as e:
-        return jsonify({
+        return json_response({
             "status": "error", 
             "message": f"Error processing request: {str(e)}"
         }), 500
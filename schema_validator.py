@@ -1,15 +1,30 @@
-import random
-import string
-import uuid
-from datetime import datetime
-from faker import Faker
+import atexit
+import copy
+import functools
+import threading
+import time
 from flask import Flask, request, jsonify
 import yaml
 import os
+from simulator_common import OrjsonProvider, locked, now_str
+from template_values import generate_dynamic_value
+
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeLoader, SafeDumper
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 CONFIG_FILE = "config.yaml"
-fake = Faker()
+REQUIRED_FIELDS = frozenset(("method", "request", "response"))
+
+# The config lives in memory; a background thread persists it after writes
+_config = None
+_config_lock = threading.RLock()
+_config_dirty = threading.Event()
+_flush_lock = threading.Lock()  # Serializes the flusher thread and the atexit flush
+FLUSH_RETRY_DELAY = 1.0  # Seconds to wait before retrying a failed flush
 
 # Ensure config file exists
 def create_empty_yaml():
@@ -18,61 +33,77 @@ def create_empty_yaml():
             yaml.dump({"endpoints": {}}, f)
 
 def read_config():
-    create_empty_yaml()
-    with open(CONFIG_FILE, "r") as f:
-        return yaml.safe_load(f) or {"endpoints": {}}
+    global _config
+    with _config_lock:
+        if _config is None:
+            create_empty_yaml()
+            with open(CONFIG_FILE, "r") as f:
+                _config = yaml.load(f, Loader=SafeLoader) or {"endpoints": {}}
+            # The persisted high-water mark keeps deleted ids from being reissued
+            existing_ids = [int(endpoint_id) for endpoints in _config["endpoints"].values()
+                            for endpoint_id in endpoints if str(endpoint_id).isdigit()]
+            _config["next_endpoint_id"] = max(_config.get("next_endpoint_id", 1), max(existing_ids, default=0) + 1)
+        return _config
+
+def next_endpoint_id(config):
+    endpoint_id = config["next_endpoint_id"]
+    config["next_endpoint_id"] = endpoint_id + 1
+    return str(endpoint_id)
 
 def write_config(config):
-    with open(CONFIG_FILE, "w") as f:
-        yaml.dump(config, f, default_flow_style=False)
-
+    global _config
+    with _config_lock:
+        _config = config
+    _config_dirty.set()
+
+def flush_config():
+    """Write the in-memory config to disk if it changed since the last flush."""
+    with _flush_lock:
+        if not _config_dirty.is_set():
+            return
+        _config_dirty.clear()
+        with _config_lock:
+            snapshot = copy.deepcopy(_config)
+        try:
+            tmp_file = CONFIG_FILE + ".tmp"
+            with open(tmp_file, "w") as f:
+                yaml.dump(snapshot, f, Dumper=SafeDumper, default_flow_style=False)
+            os.replace(tmp_file, CONFIG_FILE)
+        except Exception:
+            _config_dirty.set()  # Keep the changes pending for the next attempt
+            raise
+
+def _persist_config():
+    while True:
+        _config_dirty.wait()
+        try:
+            flush_config()
+        except Exception:
+            app.logger.exception("Failed to write %s", CONFIG_FILE)
+            time.sleep(FLUSH_RETRY_DELAY)
+
+threading.Thread(target=_persist_config, daemon=True).start()
+atexit.register(flush_config)
+
+with_config_lock = locked(_config_lock)
+
+@functools.lru_cache(maxsize=4096)
 def normalize_path(path):
     return '/' + path.strip('/')
 
-def generate_dynamic_value(value):
-    """Detect and generate dynamic values for the stored response."""
-    if isinstance(value, int):
-        return random.randint(1000, 99999)
-    elif isinstance(value, float):
-        return round(random.uniform(10.5, 99999.99), 2)
-    elif isinstance(value, bool):
-        return random.choice([True, False])
-    elif isinstance(value, list):
-        return [generate_dynamic_value(value[0]) for _ in range(random.randint(2, 5))] if value else []
-    elif isinstance(value, dict):
-        return {key: generate_dynamic_value(val) for key, val in value.items()}
-    elif isinstance(value, str):
-        if value.lower() == "{uuid}":
-            return str(uuid.uuid4())
-        elif value.lower() == "{string}":
-            return fake.name()
-        elif value.lower() == "{email}":
-            return fake.email()
-        elif value.lower() == "{phone}":
-            return fake.phone_number()
-        elif value.lower() == "{company}":
-            return fake.company()
-        elif value.lower() == "{address}":
-            return fake.address()
-        elif value.lower() == "{timestamp}":
-            return str(datetime.now())
-        else:
-            return ''.join(random.choices(string.ascii_letters + string.digits, k=8))
-    return value
-
 @app.route('/endpoint/<path:path>', methods=['POST'])
+@with_config_lock
 def register_endpoint(path):
     """Registers a new endpoint with random values each time."""
     try:
         data = request.get_json()
-        required_fields = ["method", "request", "response"]
-        if not all(field in data for field in required_fields):
-            return jsonify({"status": "error", "message": f"Missing required fields. Required: {required_fields}"}), 400
+        if not REQUIRED_FIELDS.issubset(data):
+            return jsonify({"status": "error", "message": f"Missing required fields. Required: {sorted(REQUIRED_FIELDS)}"}), 400
 
         path = normalize_path(path)
         config = read_config()
         method = data["method"].upper()
-        endpoint_id = str(uuid.uuid4())
+        endpoint_id = next_endpoint_id(config)
 
         # Generate dynamic response values
         random_response = {key: generate_dynamic_value(value) for key, value in data["response"].items()}
@@ -85,7 +116,7 @@ def register_endpoint(path):
             "method": method,
             "request": data["request"],
             "response": random_response,
-            "created_at": str(datetime.now())
+            "created_at": now_str()
         }
         write_config(config)
 
@@ -94,6 +125,7 @@ def register_endpoint(path):
         return jsonify({"status": "error", "message": str(e)}), 500
 
 @app.route('/endpoint/<path:path>', methods=['GET'])
+@with_config_lock
 def get_all_endpoints(path):
     config = read_config()
     normalized_path = normalize_path(path)
@@ -102,27 +134,27 @@ def get_all_endpoints(path):
     return jsonify({"status": "error", "message": "No endpoints found for the given path"}), 404
 
 @app.route('/endpoint/<path:path>/<endpoint_id>', methods=['GET'])
+@with_config_lock
 def get_endpoint(path, endpoint_id):
     config = read_config()
-    normalized_path = normalize_path(path)
-    if normalized_path in config["endpoints"] and endpoint_id in config["endpoints"][normalized_path]:
-        return jsonify({"status": "success", "endpoint": config["endpoints"][normalized_path][endpoint_id]}), 200
+    endpoint = config["endpoints"].get(normalize_path(path), {}).get(endpoint_id)
+    if endpoint is not None:
+        return jsonify({"status": "success", "endpoint": endpoint}), 200
     return jsonify({"status": "error", "message": "Endpoint not found"}), 404
 
 @app.route('/endpoint/<path:path>/<endpoint_id>', methods=['PUT'])
+@with_config_lock
 def update_endpoint(path, endpoint_id):
     try:
         data = request.get_json()
         config = read_config()
-        normalized_path = normalize_path(path)
-        
-        if normalized_path not in config["endpoints"] or endpoint_id not in config["endpoints"][normalized_path]:
+        endpoint = config["endpoints"].get(normalize_path(path), {}).get(endpoint_id)
+        if endpoint is None:
             return jsonify({"status": "error", "message": "Endpoint not found"}), 404
         
-        endpoint = config["endpoints"][normalized_path][endpoint_id]
         for key, value in data.items():
             endpoint[key] = value
-        endpoint["updated_at"] = str(datetime.now())
+        endpoint["updated_at"] = now_str()
         write_config(config)
 
         return jsonify({"status": "success", "message": "Endpoint updated successfully", "endpoint": endpoint}), 200
@@ -130,17 +162,26 @@ def update_endpoint(path, endpoint_id):
         return jsonify({"status": "error", "message": str(e)}), 500
 
 @app.route('/endpoint/<path:path>/<endpoint_id>', methods=['DELETE'])
+@with_config_lock
 def delete_endpoint(path, endpoint_id):
     config = read_config()
     normalized_path = normalize_path(path)
-    
-    if normalized_path in config["endpoints"] and endpoint_id in config["endpoints"][normalized_path]:
-        deleted_endpoint = config["endpoints"][normalized_path].pop(endpoint_id)
-        if not config["endpoints"][normalized_path]:
+    endpoints = config["endpoints"].get(normalized_path, {})
+    deleted_endpoint = endpoints.pop(endpoint_id, None)
+    if deleted_endpoint is not None:
+        if not endpoints:
             del config["endpoints"][normalized_path]
         write_config(config)
         return jsonify({"status": "success", "message": "Endpoint deleted successfully", "deleted_endpoint": deleted_endpoint}), 200
     return jsonify({"status": "error", "message": "Endpoint not found"}), 404
 
 if __name__ == '__main__':
-    app.run(debug=True)
+    if os.environ.get('FLASK_DEBUG') == '1':
+        app.run(debug=True, threaded=True)
+    else:
+        try:
+            from waitress import serve
+        except ImportError:
+            app.run(threaded=True)
+        else:
+            serve(app, host='127.0.0.1', port=5000, threads=16)
@@ -0,0 +1,62 @@
+import functools
+import os
+import threading
+import time
+from datetime import datetime
+from flask.json.provider import DefaultJSONProvider
+import orjson
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson."""
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_NON_STR_KEYS
+        if kwargs.get("sort_keys", self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+def locked(lock):
+    """Return a decorator that runs a view while holding lock."""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            with lock:
+                return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+_now_cache = (None, "")
+
+def now_str():
+    """Return the current local time as str(datetime), formatted at most once per second."""
+    global _now_cache
+    second = int(time.time())
+    cached_second, text = _now_cache
+    if second != cached_second:
+        text = str(datetime.fromtimestamp(second))
+        _now_cache = (second, text)
+    return text
+
+ID_BATCH = 4096  # Ids sliced from each os.urandom call
+_id_buffers = threading.local()
+
+def _reset_id_buffers():
+    global _id_buffers
+    _id_buffers = threading.local()
+
+# Forked children must not reuse the parent's buffered ids
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_id_buffers)
+
+def fast_id():
+    """Return a random 32-character hex id sliced from a per-thread batch of random bytes."""
+    buffers = _id_buffers
+    buffer = getattr(buffers, "data", b"")
+    offset = getattr(buffers, "offset", 0)
+    if offset >= len(buffer):
+        buffer = buffers.data = os.urandom(ID_BATCH * 16)
+        offset = 0
+    buffers.offset = offset + 16
+    return buffer[offset:offset + 16].hex()
@@ -0,0 +1,56 @@
+import functools
+import random
+import string
+import uuid
+from faker import Faker
+import orjson
+from simulator_common import now_str
+
+fake = Faker()
+RANDOM_INT_RANGE = range(1000, 100000)
+ALPHANUMERIC = string.ascii_letters + string.digits
+
+def _random_token():
+    return ''.join(random.choices(ALPHANUMERIC, k=8))
+
+# Placeholder strings in templates, mapped to their value generators
+TEMPLATE_GENERATORS = {
+    "{uuid}": lambda: str(uuid.uuid4()),
+    "{string}": fake.name,
+    "{email}": fake.email,
+    "{phone}": fake.phone_number,
+    "{company}": fake.company,
+    "{address}": fake.address,
+    "{timestamp}": now_str,
+}
+
+def compile_dynamic_value(value):
+    """Compile a template into a function that generates fresh dynamic values."""
+    if isinstance(value, int):
+        return lambda: random.randint(1000, 99999)
+    elif isinstance(value, float):
+        return lambda: round(random.uniform(10.5, 99999.99), 2)
+    elif isinstance(value, bool):
+        return lambda: random.choice([True, False])
+    elif isinstance(value, list):
+        if not value:
+            return list
+        if isinstance(value[0], int):
+            # Draw the whole integer array in one call instead of one randint() per item
+            return lambda: random.choices(RANDOM_INT_RANGE, k=random.randint(2, 5))
+        generate_item = compile_dynamic_value(value[0])
+        return lambda: [generate_item() for _ in range(random.randint(2, 5))]
+    elif isinstance(value, dict):
+        fields = [(key, compile_dynamic_value(val)) for key, val in value.items()]
+        return lambda: {key: generate() for key, generate in fields}
+    elif isinstance(value, str):
+        return TEMPLATE_GENERATORS.get(value.lower(), _random_token)
+    return lambda: value
+
+@functools.lru_cache(maxsize=1024)
+def _compiled_template(encoded):
+    return compile_dynamic_value(orjson.loads(encoded))
+
+def generate_dynamic_value(value):
+    """Generate dynamic values from a template, compiling each distinct template once."""
+    return _compiled_template(orjson.dumps(value))()
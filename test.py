@@ -1,35 +1,119 @@
+import atexit
+import functools
 import random
-import uuid
-from datetime import datetime
+import tempfile
+import threading
+import time
 from flask import Flask, request, jsonify
-from jinja2 import escape
+import orjson
 import yaml
 import os
+from simulator_common import OrjsonProvider, fast_id, locked, now_str
 # import openai
 
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
 app = Flask(__name__)
-CONFIG_FILE = "config.yaml"
+app.json = OrjsonProvider(app)
+CONFIG_FILE = "config.json"
+LEGACY_CONFIG_FILE = "config.yaml"
+REQUIRED_FIELDS = frozenset(("request", "response"))
+_config_cache = {"mtime": None, "data": None, "version": 0}  # Parsed config, valid while the file's mtime is unchanged
+_instance_index = {"version": None, "paths": {}}  # Per-path id -> (position, instance), rebuilt after config changes
+_config_lock = threading.RLock()
+_config_dirty = threading.Event()
+FLUSH_DELAY = 0.05  # Seconds to coalesce config writes before flushing them to disk
+FLUSH_RETRY_DELAY = 1.0  # Seconds to wait before retrying a failed flush
 
 # openai.api_key = "your-openai-api-key"  # Replace with your actual OpenAI API key
 
 # Ensure config file exists
-def create_empty_yaml():
+def create_empty_config():
     if not os.path.exists(CONFIG_FILE):
-        with open(CONFIG_FILE, "w") as f:
-            yaml.dump({"endpoints": {}}, f)
+        config = {"endpoints": {}}
+        # Carry over endpoints registered while the config was still stored as YAML
+        if os.path.exists(LEGACY_CONFIG_FILE):
+            with open(LEGACY_CONFIG_FILE, "r") as f:
+                config = yaml.load(f, Loader=SafeLoader) or config
+        with open(CONFIG_FILE, "wb") as f:
+            f.write(orjson.dumps(config, option=orjson.OPT_INDENT_2))
 
 def read_config():
-    create_empty_yaml()
-    with open(CONFIG_FILE, "r") as f:
-        return yaml.safe_load(f) or {"endpoints": {}}
+    """Return the shared in-memory config, taking the lock only to reload it after an outside edit."""
+    try:
+        mtime = os.stat(CONFIG_FILE).st_mtime_ns
+    except FileNotFoundError:
+        create_empty_config()
+        mtime = None
+    # Reloads and flushes publish "data" before "mtime", so a matching mtime means "data" is current
+    if mtime is not None and mtime == _config_cache["mtime"]:
+        return _config_cache["data"]
+    with _config_lock:
+        mtime = os.stat(CONFIG_FILE).st_mtime_ns
+        if mtime != _config_cache["mtime"]:
+            with open(CONFIG_FILE, "rb") as f:
+                _config_cache["data"] = orjson.loads(f.read()) or {"endpoints": {}}
+            _config_cache["mtime"] = mtime
+            _config_cache["version"] += 1
+        return _config_cache["data"]
 
 def write_config(config):
-    with open(CONFIG_FILE, "w") as f:
-        yaml.dump(config, f, default_flow_style=False)
-
+    # Handlers only mark the config dirty; the flusher thread persists it
+    _config_cache["data"] = config
+    _config_cache["version"] += 1
+    _config_dirty.set()
+
+def flush_config():
+    """Write the in-memory config to disk if it changed since the last flush."""
+    if not _config_dirty.is_set():
+        return
+    _config_dirty.clear()
+    with _config_lock:
+        try:
+            # Write a sibling temp file and swap it in, so readers never see a half-written config
+            fd, tmp_file = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(CONFIG_FILE)), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(orjson.dumps(_config_cache["data"], option=orjson.OPT_INDENT_2))
+            os.replace(tmp_file, CONFIG_FILE)
+        except Exception:
+            _config_dirty.set()  # Keep the changes pending for the next attempt
+            raise
+        _config_cache["mtime"] = os.stat(CONFIG_FILE).st_mtime_ns
+
+def _flush_config_periodically():
+    while True:
+        _config_dirty.wait()
+        time.sleep(FLUSH_DELAY)
+        try:
+            flush_config()
+        except Exception:
+            app.logger.exception("Failed to write %s", CONFIG_FILE)
+            time.sleep(FLUSH_RETRY_DELAY)
+
+threading.Thread(target=_flush_config_periodically, daemon=True).start()
+atexit.register(flush_config)
+
+with_config_lock = locked(_config_lock)
+
+@functools.lru_cache(maxsize=4096)
 def normalize_path(path):
     return '/' + path.strip('/')
 
+def find_instance(config, path, endpoint_id):
+    """Find a path's instance by id through a hash index that is rebuilt only after the config changes."""
+    if _instance_index["version"] != _config_cache["version"]:
+        _instance_index["version"] = _config_cache["version"]
+        _instance_index["paths"] = {}
+    index = _instance_index["paths"].get(path)
+    if index is None:
+        index = _instance_index["paths"][path] = {}
+        for position, instance in enumerate(config["endpoints"].get(path, {}).get("instances", [])):
+            index.setdefault(instance["id"], (position, instance))
+    return index.get(endpoint_id, (None, None))
+
 # def generate_dynamic_value(schema):
 #     """Use OpenAI to generate structured random responses based on the schema."""
 #     prompt = f"Generate a JSON response matching this schema: {schema}"
@@ -40,6 +124,7 @@ def normalize_path(path):
 #     )
 #     return response["choices"][0]["message"]["content"]
 @app.route('/olbb-simulator/<path:path>', methods=['POST'])
+@with_config_lock
 def register_endpoint(path):
     """Registers a new endpoint with request and response schemas."""
     try:
@@ -48,7 +133,7 @@ def register_endpoint(path):
         normalized_path = normalize_path(path)
         method = data.get("method", "POST").upper()
 
-        if "request" not in data or "response" not in data:
+        if not REQUIRED_FIELDS.issubset(data):
             return jsonify({"status": "error", "message": "Missing request or response schema"}), 400
 
         if normalized_path not in config["endpoints"]:
@@ -59,14 +144,14 @@ def register_endpoint(path):
         if len(instances) == 0:
             instance_id = None  # No UUID for first request
         else:
-            instance_id = str(uuid.uuid4())
+            instance_id = fast_id()
         
         new_instance = {
             "id": instance_id,
             "method": method,
             "request_schema": data["request"],
             "response_schema": data["response"],
-            "created_at": str(datetime.now())
+            "created_at": now_str()
         }
         instances.append(new_instance)
         write_config(config)
@@ -114,109 +199,59 @@ def register_endpoint(path):
 #         return jsonify({"status": "error", "message": str(e)}), 500
 
 @app.route('/olbb-simulator/<path:path>', methods=['GET'])
+@with_config_lock
 def get_all_endpoints(path):
     config = read_config()
     normalized_path = normalize_path(path)
     if normalized_path in config["endpoints"]:
-        return jsonify({"status": "success", "endpoints": config["endpoints"][normalized_path]}), 200
+        return jsonify({"status": "success", "endpoints": config["endpoints"][normalized_path]["instances"]}), 200
     return jsonify({"status": "error", "message": "No endpoints found for the given path"}), 404
 
 @app.route('/olbb-simulator/<path:path>/<endpoint_id>', methods=['GET'])
+@with_config_lock
 def get_endpoint(path, endpoint_id):
     config = read_config()
     normalized_path = normalize_path(path)
-    if normalized_path in config["endpoints"]:
-        for instance in config["endpoints"][normalized_path].get("instances", []):
-            if instance["id"] == endpoint_id:
-                return jsonify({"status": "success", "endpoint": instance}), 200
+    _, instance = find_instance(config, normalized_path, endpoint_id)
+    if instance is not None:
+        return jsonify({"status": "success", "endpoint": instance}), 200
     return jsonify({"status": "error", "message": "Endpoint not found"}), 404
 
-@app.route('/olbb-simulator/<path:path>/<endpoint_id>', methods=['PUT'])
-def update_endpoint(path, endpoint_id):
+def _update(path, endpoint_id=None):
+    """Update one instance by id, or a path's only instance when no id is given."""
     try:
         data = request.get_json()
         config = read_config()
         normalized_path = normalize_path(path)
-        
-        if normalized_path in config["endpoints"]:
-            for instance in config["endpoints"][normalized_path].get("instances", []):
-                if instance["id"] == endpoint_id:
-                    instance.update(data)
-                    instance["updated_at"] = str(datetime.now())
-                    write_config(config)
-                    return jsonify({"status": "success", "message": "Endpoint updated successfully", "endpoint": instance}), 200
-        return jsonify({"status": "error", "message": "Endpoint not found"}), 404
+
+        if endpoint_id is None:
+            instances = config["endpoints"].get(normalized_path, {}).get("instances", [])
+            instance = instances[0] if len(instances) == 1 else None
+            not_found = "Endpoint not found or multiple instances exist"
+        else:
+            _, instance = find_instance(config, normalized_path, endpoint_id)
+            not_found = "Endpoint not found"
+        if instance is not None:
+            instance.update(data)
+            instance["updated_at"] = now_str()
+            write_config(config)
+            return jsonify({"status": "success", "message": "Endpoint updated successfully", "endpoint": instance}), 200
+        return jsonify({"status": "error", "message": not_found}), 404
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
-@app.route('/olbb-simulator/<path:path>/<endpoint_id>', methods=['DELETE'])
-def delete_endpoint(path, endpoint_id):
-    config = read_config()
-    normalized_path = normalize_path(path)
-    
-    if normalized_path in config["endpoints"]:
-        instances = config["endpoints"][normalized_path].get("instances", [])
-        for i, instance in enumerate(instances):
-            if instance["id"] == endpoint_id:
-                del instances[i]
-                write_config(config)
-                return jsonify({"status": "success", "message": "Endpoint deleted successfully"}), 200
-    return jsonify({"status": "error", "message": "Endpoint not found"}), 404
-
-if __name__ == '__main__':
-    app.run(debug=True)
-
-
-
-
-
-
-#changes
-@app.route('/olbb-simulator/<path:path>', methods=['GET'])
-def get_all_endpoints(path):
-    config = read_config()
-    normalized_path = normalize_path(path)
-    if normalized_path in config["endpoints"]:
-        return jsonify({"status": "success", "endpoints": config["endpoints"][normalized_path]["instances"]}), 200
-    return jsonify({"status": "error", "message": "No endpoints found for the given path"}), 404
-
 @app.route('/olbb-simulator/<path:path>', methods=['PUT'])
+@with_config_lock
 def update_endpoint_general(path):
-    try:
-        data = request.get_json()
-        config = read_config()
-        normalized_path = normalize_path(path)
-
-        if normalized_path in config["endpoints"]:
-            instances = config["endpoints"][normalized_path]["instances"]
-            if len(instances) == 1:
-                instances[0].update(data)
-                instances[0]["updated_at"] = str(datetime.now())
-                write_config(config)
-                return jsonify({"status": "success", "message": "Endpoint updated successfully", "endpoint": instances[0]}), 200
-        return jsonify({"status": "error", "message": "Endpoint not found or multiple instances exist"}), 404
-    except Exception as e:
-        return jsonify({"status": "error", "message": str(e)}), 500
+    return _update(path)
 
 @app.route('/olbb-simulator/<path:path>/<endpoint_id>', methods=['PUT'])
+@with_config_lock
 def update_endpoint_by_id(path, endpoint_id):
-    try:
-        data = request.get_json()
-        config = read_config()
-        normalized_path = normalize_path(path)
-
-        if normalized_path in config["endpoints"]:
-            for instance in config["endpoints"][normalized_path].get("instances", []):
-                if instance["id"] == endpoint_id:
-                    instance.update(data)
-                    instance["updated_at"] = str(datetime.now())
-                    write_config(config)
-                    return jsonify({"status": "success", "message": "Endpoint updated successfully", "endpoint": instance}), 200
-        return jsonify({"status": "error", "message": "Endpoint not found"}), 404
-    except Exception as e:
-        return jsonify({"status": "error", "message": str(e)}), 500
+    return _update(path, endpoint_id)
 
 @app.route('/olbb-simulator/<path:path>', methods=['DELETE'])
+@with_config_lock
 def delete_all_endpoints(path):
     config = read_config()
     normalized_path = normalize_path(path)
@@ -227,15 +262,24 @@ def delete_all_endpoints(path):
     return jsonify({"status": "error", "message": "No endpoints found for the given path"}), 404
 
 @app.route('/olbb-simulator/<path:path>/<endpoint_id>', methods=['DELETE'])
+@with_config_lock
 def delete_endpoint_by_id(path, endpoint_id):
     config = read_config()
     normalized_path = normalize_path(path)
-    if normalized_path in config["endpoints"]:
-        instances = config["endpoints"][normalized_path].get("instances", [])
-        for i, instance in enumerate(instances):
-            if instance["id"] == endpoint_id:
-                del instances[i]
-                write_config(config)
-                return jsonify({"status": "success", "message": "Endpoint deleted successfully"}), 200
+    index, instance = find_instance(config, normalized_path, endpoint_id)
+    if instance is not None:
+        del config["endpoints"][normalized_path]["instances"][index]
+        write_config(config)
+        return jsonify({"status": "success", "message": "Endpoint deleted successfully"}), 200
     return jsonify({"status": "error", "message": "Endpoint not found"}), 404
 
+if __name__ == '__main__':
+    if os.environ.get('FLASK_DEBUG') == '1':
+        app.run(debug=True, threaded=True)
+    else:
+        try:
+            from waitress import serve
+        except ImportError:
+            app.run(threaded=True)
+        else:
+            serve(app, host='127.0.0.1', port=5000, threads=16)
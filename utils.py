@@ -1,18 +1,43 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request
+import orjson
 import yaml
+from collections import defaultdict
+import functools
+import itertools
+import mmap
 import os
-from typing import Dict, Any, List
-import jsonschema
-from jsonschema import validate, ValidationError
+import re
+from typing import Dict, Any, List, Callable, Iterator, Tuple
+import fastjsonschema
 from datetime import datetime
 
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
 app = Flask(__name__)
+# Responses are built from already-validated requests, so re-checking them is opt-in
+app.config['VALIDATE_RESPONSES'] = os.environ.get('VALIDATE_RESPONSES') == '1'
 
 # Global storage and configuration
-storage = {}
-id_counters = {}
+storage: Dict[str, Dict[str, Dict]] = defaultdict(dict)
+# A C-level factory keeps the counter's creation atomic across request threads
+id_counters: Dict[str, Iterator[int]] = defaultdict(functools.partial(itertools.count, 1))
 spec = {}
 endpoints = {}
+request_schemas = {}
+response_schemas = {}
+_compiled_validators: Dict[int, Tuple[Dict, Callable]] = {}
+PATH_PARAM_PATTERN = re.compile(r'\{([^}]+)\}')
+# Operation keys of an OpenAPI path item; the rest (parameters, summary, servers) are not operations
+HTTP_METHODS = frozenset(('get', 'put', 'post', 'delete', 'patch', 'options', 'head', 'trace'))
+
+# OpenAPI numeric/string formats that JSON Schema does not define
+OPENAPI_FORMATS = {
+    fmt: lambda value: True
+    for fmt in ('int32', 'int64', 'float', 'double', 'byte', 'binary', 'password')
+}
 
 class ValidationException(Exception):
     """Custom exception for schema validation errors"""
@@ -30,52 +55,90 @@ def resolve_schema_reference(schema: Dict) -> Dict:
 
 def get_next_id(entity_type: str) -> str:
     """Get next ID for an entity type"""
-    if entity_type not in id_counters:
-        id_counters[entity_type] = 1
-    current_id = str(id_counters[entity_type])
-    id_counters[entity_type] += 1
-    return current_id
+    return str(next(id_counters[entity_type]))
 
-def initialize_storage(entity_type: str):
-    """Initialize storage for an entity type if it doesn't exist"""
-    if entity_type not in storage:
-        storage[entity_type] = {}
+def index_schemas():
+    """Flatten resolved request/response schemas of the spec into lookup tables"""
+    request_schemas.clear()
+    _compiled_validators.clear()
+    response_schemas.clear()
+    for path, path_spec in spec.get('paths', {}).items():
+        for method, method_spec in path_spec.items():
+            if method.lower() not in HTTP_METHODS:
+                continue
+            request_body = method_spec.get('requestBody', {})
+            schema = request_body.get('content', {}).get('application/json', {}).get('schema', {})
+            request_schemas[(path, method.lower())] = resolve_schema_reference(schema)
+            for status_code, response_spec in method_spec.get('responses', {}).items():
+                schema = response_spec.get('content', {}).get('application/json', {}).get('schema', {})
+                response_schemas[(path, method.lower(), str(status_code))] = resolve_schema_reference(schema)
+    # Compile every validator up front so no request pays for code generation
+    checked_schemas = [*request_schemas.values()]
+    if app.config['VALIDATE_RESPONSES']:
+        checked_schemas += response_schemas.values()
+    for schema in checked_schemas:
+        if schema:
+            get_validator(schema)
 
 def get_request_schema(path: str, method: str) -> Dict:
     """Get request schema from OpenAPI spec"""
-    path_spec = spec.get('paths', {}).get(path, {})
-    method_spec = path_spec.get(method.lower(), {})
-    request_body = method_spec.get('requestBody', {})
-    schema = request_body.get('content', {}).get('application/json', {}).get('schema', {})
-    return resolve_schema_reference(schema)
+    return request_schemas.get((path, method.lower()), {})
 
 def get_response_schema(path: str, method: str, status_code: str) -> Dict:
     """Get response schema from OpenAPI spec"""
-    path_spec = spec.get('paths', {}).get(path, {})
-    method_spec = path_spec.get(method.lower(), {})
-    responses = method_spec.get('responses', {})
-    response_spec = responses.get(str(status_code), {})
-    schema = response_spec.get('content', {}).get('application/json', {}).get('schema', {})
-    return resolve_schema_reference(schema)
+    return response_schemas.get((path, method.lower(), str(status_code)), {})
+
+def get_validator(schema: Dict) -> Callable:
+    """Get the compiled validator for a schema, compiling it on first use"""
+    cached = _compiled_validators.get(id(schema))
+    if cached is None:
+        validator = fastjsonschema.compile(
+            {**schema, 'components': spec.get('components', {})},
+            formats=OPENAPI_FORMATS
+        )
+        # Keep the schema alive alongside its validator so its id is never reused
+        cached = _compiled_validators[id(schema)] = (schema, validator)
+    return cached[1]
 
 def validate_schema(data: Dict, schema: Dict, context: str):
     """Validate data against schema"""
     if not schema:
         return
     try:
-        validate(instance=data, schema=schema)
-    except ValidationError as e:
+        get_validator(schema)(data)
+    except fastjsonschema.JsonSchemaException as e:
         raise ValidationException(f"{context} validation failed: {str(e)}")
 
+def compile_schema_check(schema: Dict, context: str) -> Callable:
+    """Specialize validate_schema to one schema so a route can validate without any lookups"""
+    if not schema:
+        return lambda data: None
+    validator = get_validator(schema)
+    def check(data):
+        try:
+            validator(data)
+        except fastjsonschema.JsonSchemaException as e:
+            raise ValidationException(f"{context} validation failed: {str(e)}")
+    return check
+
+def compile_response_check(path: str, method: str, status_code: int) -> Callable:
+    """Build a route's response check, or a no-op unless VALIDATE_RESPONSES is enabled"""
+    if not app.config['VALIDATE_RESPONSES']:
+        return lambda data: None
+    return compile_schema_check(get_response_schema(path, method, status_code), "Response")
+
 def extract_path_param(path: str) -> str:
     """Extract the path parameter name from a path template"""
-    parts = path.split('{')
-    if len(parts) > 1:
-        return parts[1].split('}')[0]
-    return None
+    match = PATH_PARAM_PATTERN.search(path)
+    return match.group(1) if match else None
+
+def to_flask_path(path: str) -> str:
+    """Convert an OpenAPI path template to a Flask rule with a resource_id argument"""
+    return PATH_PARAM_PATTERN.sub('<resource_id>', path)
 
 def register_endpoints():
     """Register endpoints dynamically based on OpenAPI spec"""
+    index_schemas()
     for path, path_spec in spec.get('paths', {}).items():
         # Extract the base resource type from the path
         parts = path.strip('/').split('/')
@@ -83,7 +146,6 @@ def register_endpoints():
             continue
             
         resource_type = parts[0]
-        initialize_storage(resource_type)
         
         # Register collection endpoints (e.g., /books)
         if len(parts) == 1:
@@ -102,106 +164,158 @@ def register_endpoints():
             if 'delete' in path_spec:
                 register_delete_endpoint(resource_type, path, id_param)
 
+def json_body() -> Any:
+    """Parse the JSON request body with orjson, reading it only once"""
+    if not request.is_json:
+        return request.on_json_loading_failed(None)
+    return orjson.loads(request.get_data(cache=False))
+
+def json_response(payload: Any, status: int) -> Response:
+    """Serialize a payload with orjson straight into a JSON response"""
+    return Response(orjson.dumps(payload), status, mimetype='application/json')
+
 def register_create_endpoint(resource_type: str, path: str):
     """Register POST endpoint for creating resources"""
-    @app.route(path, methods=['POST'])
+    check_request = compile_schema_check(get_request_schema(path, 'post'), "Request")
+    check_response = compile_response_check(path, 'post', 201)
+    store = storage[resource_type]
+    @app.route(path, methods=['POST'], endpoint=f"post_{path}")
     def create():
         try:
-            data = request.get_json()
-            validate_schema(data, get_request_schema(path, 'post'), "Request")
+            data = json_body()
+            check_request(data)
             
             resource_id = get_next_id(resource_type)
             data['id'] = resource_id
             data['created_at'] = datetime.utcnow().isoformat()
             
-            storage[resource_type][resource_id] = data
-            validate_schema(data, get_response_schema(path, 'post', 201), "Response")
-            return jsonify(data), 201
+            store[resource_id] = data
+            check_response(data)
+            return json_response(data, 201)
         
         except ValidationException as e:
-            return jsonify({"error": str(e)}), 400
+            return json_response({"error": str(e)}, 400)
         except Exception as e:
-            return jsonify({"error": str(e)}), 400
+            return json_response({"error": str(e)}, 400)
 
 def register_list_endpoint(resource_type: str, path: str):
     """Register GET endpoint for listing resources"""
-    @app.route(path, methods=['GET'])
+    check_response = compile_response_check(path, 'get', 200)
+    store = storage[resource_type]
+    @app.route(path, methods=['GET'], endpoint=f"get_{path}")
     def list_resources():
         try:
-            resources = list(storage[resource_type].values())
-            validate_schema(resources, get_response_schema(path, 'get', 200), "Response")
-            return jsonify(resources), 200
+            resources = list(store.values())
+            check_response(resources)
+            return json_response(resources, 200)
         
         except ValidationException as e:
-            return jsonify({"error": str(e)}), 400
+            return json_response({"error": str(e)}, 400)
         except Exception as e:
-            return jsonify({"error": str(e)}), 400
+            return json_response({"error": str(e)}, 400)
 
 def register_get_endpoint(resource_type: str, path: str, id_param: str):
     """Register GET endpoint for retrieving a single resource"""
-    @app.route(path, methods=['GET'])
+    check_response = compile_response_check(path, 'get', 200)
+    store = storage[resource_type]
+    @app.route(to_flask_path(path), methods=['GET'], endpoint=f"get_{path}")
     def get(resource_id):
         try:
-            if resource_id not in storage[resource_type]:
-                return jsonify({"error": f"{resource_type} not found"}), 404
+            resource = store.get(resource_id)
+            if resource is None:
+                return json_response({"error": f"{resource_type} not found"}, 404)
             
-            resource = storage[resource_type][resource_id]
-            validate_schema(resource, get_response_schema(path, 'get', 200), "Response")
-            return jsonify(resource), 200
+            check_response(resource)
+            return json_response(resource, 200)
         
         except ValidationException as e:
-            return jsonify({"error": str(e)}), 400
+            return json_response({"error": str(e)}, 400)
         except Exception as e:
-            return jsonify({"error": str(e)}), 400
+            return json_response({"error": str(e)}, 400)
 
 def register_update_endpoint(resource_type: str, path: str, id_param: str):
     """Register PUT endpoint for updating resources"""
-    @app.route(path, methods=['PUT'])
+    check_request = compile_schema_check(get_request_schema(path, 'put'), "Request")
+    check_response = compile_response_check(path, 'put', 200)
+    store = storage[resource_type]
+    @app.route(to_flask_path(path), methods=['PUT'], endpoint=f"put_{path}")
     def update(resource_id):
         try:
-            if resource_id not in storage[resource_type]:
-                return jsonify({"error": f"{resource_type} not found"}), 404
+            resource = store.get(resource_id)
+            if resource is None:
+                return json_response({"error": f"{resource_type} not found"}, 404)
                 
-            data = request.get_json()
-            validate_schema(data, get_request_schema(path, 'put'), "Request")
+            data = json_body()
+            check_request(data)
             
-            # Preserve id and created_at
-            data['id'] = resource_id
-            data['created_at'] = storage[resource_type][resource_id]['created_at']
+            # Merge into the stored resource, preserving id and created_at
+            created_at = resource['created_at']
+            resource.update(data)
+            resource['id'] = resource_id
+            resource['created_at'] = created_at
             
-            storage[resource_type][resource_id] = data
-            validate_schema(data, get_response_schema(path, 'put', 200), "Response")
-            return jsonify(data), 200
+            check_response(resource)
+            return json_response(resource, 200)
         
         except ValidationException as e:
-            return jsonify({"error": str(e)}), 400
+            return json_response({"error": str(e)}, 400)
         except Exception as e:
-            return jsonify({"error": str(e)}), 400
+            return json_response({"error": str(e)}, 400)
 
 def register_delete_endpoint(resource_type: str, path: str, id_param: str):
     """Register DELETE endpoint for removing resources"""
-    @app.route(path, methods=['DELETE'])
+    store = storage[resource_type]
+    @app.route(to_flask_path(path), methods=['DELETE'], endpoint=f"delete_{path}")
     def delete(resource_id):
         try:
-            if resource_id not in storage[resource_type]:
-                return jsonify({"error": f"{resource_type} not found"}), 404
+            if store.pop(resource_id, None) is None:
+                return json_response({"error": f"{resource_type} not found"}, 404)
             
-            storage[resource_type].pop(resource_id)
             return '', 204
         
         except Exception as e:
-            return jsonify({"error": str(e)}), 400
+            return json_response({"error": str(e)}, 400)
+
+def inline_refs(node: Any, root: Dict, cache: Dict[str, Any], resolving: Tuple[str, ...] = ()) -> Any:
+    """Replace local $ref nodes with the subtrees they point to, leaving recursive refs in place"""
+    if isinstance(node, dict):
+        ref = node.get('$ref')
+        if isinstance(ref, str) and ref.startswith('#/') and ref not in resolving:
+            if ref not in cache:
+                target = root
+                for part in ref[2:].split('/'):
+                    target = target[part]
+                cache[ref] = inline_refs(target, root, cache, resolving + (ref,))
+            return cache[ref]
+        return {key: inline_refs(value, root, cache, resolving) for key, value in node.items()}
+    if isinstance(node, list):
+        return [inline_refs(item, root, cache, resolving) for item in node]
+    return node
 
 def load_spec(spec_file: str) -> Dict:
-    """Load and parse the OpenAPI specification"""
+    """Load and parse the OpenAPI specification with every local $ref inlined"""
     if not os.path.exists(spec_file):
         raise FileNotFoundError(f"Specification file {spec_file} not found.")
-    with open(spec_file, 'r') as file:
-        return yaml.safe_load(file)
+    with open(spec_file, 'rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            raw_spec = None
+        else:
+            # Let libyaml read straight from the mapped pages instead of a str copy
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                raw_spec = yaml.load(mapped, Loader=SafeLoader)
+    return inline_refs(raw_spec, raw_spec, {})
 
 if __name__ == '__main__':
     import sys
     spec_file = sys.argv[1] if len(sys.argv) > 1 else 'openapi.yaml'
     spec = load_spec(spec_file)
     register_endpoints()
-    app.run(debug=True, port=5000)
+    if os.environ.get('FLASK_DEBUG') == '1':
+        app.run(debug=True, threaded=True, port=5000)
+    else:
+        try:
+            from waitress import serve
+        except ImportError:
+            app.run(threaded=True, port=5000)
+        else:
+            serve(app, host='127.0.0.1', port=5000, threads=16)
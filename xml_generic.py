@@ -0,0 +1,254 @@
+# Generic XML request/response simulator. Run: python xml_generic.py (or hypercorn xml_generic:app)
+import asyncio
+import atexit
+import copy
+import functools
+import hashlib
+import threading
+import uuid
+import xmltodict
+from datetime import datetime
+from quart import Quart, request, Response
+from hypercorn.asyncio import serve
+from hypercorn.config import Config
+import orjson
+import uvloop
+import yaml
+import os
+
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeLoader, SafeDumper
+
+app = Quart(__name__)
+CONFIG_FILE = "config.yaml"
+FLUSH_DELAY = 5.0  # Seconds to batch config writes before flushing them to disk
+DUMP_BUFFER_SIZE = 1 << 20  # Write buffer for config dumps, so a flush takes few write syscalls
+_config = None
+_flush_handle = None
+_flush_tasks = set()  # In-flight background dumps, kept referenced until they finish
+_flush_version = 0  # Bumped for every snapshot handed to dump_config
+_dumped_version = 0  # Version of the snapshot currently on disk
+_dump_lock = threading.Lock()
+_pair_digests = {}  # Per-path digests of stored request/response pairs
+
+def read_config():
+    """Returns the in-memory configuration, loading the file on first use."""
+    global _config
+    if _config is None:
+        try:
+            with open(CONFIG_FILE, "r") as f:
+                _config = yaml.load(f, Loader=SafeLoader) or {"xml_endpoints": {}}
+        except FileNotFoundError:
+            _config = {"xml_endpoints": {}}
+    return _config
+
+def write_config(config):
+    """Keeps the configuration in memory and schedules a batched flush."""
+    global _config, _flush_handle
+    _config = config
+    if _flush_handle is None:
+        _flush_handle = asyncio.get_running_loop().call_later(FLUSH_DELAY, _start_flush)
+
+def _start_flush():
+    """Snapshots the configuration on the event loop and writes it from a worker thread."""
+    global _flush_handle, _flush_version
+    _flush_handle = None
+    _flush_version += 1
+    snapshot = copy.deepcopy(_config)
+    task = asyncio.get_running_loop().create_task(asyncio.to_thread(dump_config, _flush_version, snapshot))
+    _flush_tasks.add(task)
+    task.add_done_callback(_flush_done)
+
+def _flush_done(task):
+    """Forgets a finished background dump and logs it if it failed."""
+    _flush_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        app.logger.error("Failed to write %s", CONFIG_FILE, exc_info=task.exception())
+
+def dump_config(version, config):
+    """Atomically replaces the configuration file unless a newer snapshot is already there."""
+    global _dumped_version
+    with _dump_lock:
+        if version <= _dumped_version:
+            return
+        tmp_file = CONFIG_FILE + ".tmp"
+        with open(tmp_file, "w", buffering=DUMP_BUFFER_SIZE) as f:
+            yaml.dump(config, f, Dumper=SafeDumper, default_flow_style=None)
+        os.replace(tmp_file, CONFIG_FILE)
+        _dumped_version = version
+
+def flush_config():
+    """Writes any batched configuration changes to disk immediately."""
+    global _flush_handle, _flush_version
+    if _flush_handle is not None:
+        _flush_handle.cancel()
+        _flush_handle = None
+        _flush_version += 1
+        dump_config(_flush_version, _config)
+
+app.after_serving(flush_config)
+atexit.register(flush_config)
+
+class JSONResponse(Response):
+    """Response whose content type is JSON by default."""
+    default_mimetype = "application/json"
+
+def json_response(payload, status):
+    """Builds a JSON response serialized with orjson."""
+    return JSONResponse(orjson.dumps(payload), status=status)
+
+@functools.lru_cache(maxsize=4096)
+def normalize_path(path):
+    """Standardizes path format."""
+    return '/' + path.strip('/')
+
+def pair_digest(request_data, response_data):
+    """Hashes a request/response pair so that equal pairs, and only those, share a digest."""
+    return hashlib.blake2b(orjson.dumps([request_data, response_data], option=orjson.OPT_SORT_KEYS), digest_size=16).digest()
+
+def stored_pair_digests(path, instances):
+    """Returns the digests of a path's stored pairs, hashing them on first use."""
+    digests = _pair_digests.get(path)
+    if digests is None:
+        digests = _pair_digests[path] = {pair_digest(instance["request"], instance["response"]) for instance in instances}
+    return digests
+
+# Sample body for POST /olbb-simulator/xml/<path>
+# <OrderInfo>
+#     <Request>
+#         <OrderDetails>
+#             <OrderID>ORD123456</OrderID>
+#             <OrderDate>2023-10-01T14:30:00Z</OrderDate>
+#             <TotalAmount currency="USD">250.00</TotalAmount>
+#         </OrderDetails>
+#
+#         <Customer>
+#             <CustomerID>CU12345</CustomerID>
+#             <FirstName>Jane</FirstName>
+#             <LastName>Smith</LastName>
+#             <Email>jane.smith@example.com</Email>
+#             <PhoneNumber>+1234567890</PhoneNumber>
+#             <ShippingAddress>
+#                 <Street>123 Elm St</Street>
+#                 <City>Springfield</City>
+#                 <State>IL</State>
+#                 <ZipCode>62701</ZipCode>
+#                 <Country>USA</Country>
+#             </ShippingAddress>
+#         </Customer>
+#
+#         <Items>
+#             <Item>
+#                 <ItemID>ITM001</ItemID>
+#                 <ProductName>Wireless Mouse</ProductName>
+#                 <Quantity>2</Quantity>
+#                 <Price currency="USD">25.00</Price>
+#             </Item>
+#             <Item>
+#                 <ItemID>ITM002</ItemID>
+#                 <ProductName>Mechanical Keyboard</ProductName>
+#                 <Quantity>1</Quantity>
+#                 <Price currency="USD">100.00</Price>
+#             </Item>
+#             <Item>
+#                 <ItemID>ITM003</ItemID>
+#                 <ProductName>HD Monitor</ProductName>
+#                 <Quantity>1</Quantity>
+#                 <Price currency="USD">150.00</Price>
+#             </Item>
+#         </Items>
+#
+#         <PaymentInformation>
+#             <PaymentMethod>CreditCard</PaymentMethod>
+#             <CardDetails>
+#                 <CardNumber>************1111</CardNumber>
+#                 <ExpiryDate>12/25</ExpiryDate>
+#                 <CVV>***</CVV>
+#             </CardDetails>
+#             <BillingAddress>
+#                 <Street>456 Oak St</Street>
+#                 <City>Springfield</City>
+#                 <State>IL</State>
+#                 <ZipCode>62701</ZipCode>
+#                 <Country>USA</Country>
+#             </BillingAddress>
+#         </PaymentInformation>
+#     </Request>
+#     <Response>
+#         <Status>Success</Status>
+#         <Message>Order processed successfully.</Message>
+#         <OrderID>ORD123456</OrderID>
+#         <TransactionID>TXN987654</TransactionID>
+#         <Timestamp>2023-10-01T14:35:00Z</Timestamp>
+#     </Response>
+# </OrderInfo>
+@app.route('/olbb-simulator/xml/<path:path>', methods=['POST'])
+async def register_generic_xml(path):
+    """Registers a generic XML-based request and response under a given path."""
+    try:
+        # Read XML data from request body
+        xml_data = await request.get_data(cache=False)  # expat decodes the raw bytes itself
+        parsed_data = xmltodict.parse(xml_data)  # Convert XML to dict
+
+        # Dynamically identify the root node
+        root_key = next(iter(parsed_data))  # Get the first key (root)
+        if root_key not in parsed_data:
+            return json_response({"status": "error", "message": "Invalid XML format"}, 400)
+
+        root_content = parsed_data[root_key]
+
+        # Ensure request and response parts exist dynamically
+        request_data = None
+        response_data = None
+
+        for key, value in root_content.items():
+            if "request" in key.lower():
+                request_data = value
+            elif "response" in key.lower():
+                response_data = value
+
+        if not request_data or not response_data:
+            return json_response({"status": "error", "message": "XML must contain both <Request> and <Response> sections"}, 400)
+
+        # Load config and normalize path
+        config = read_config()
+        normalized_path = normalize_path(path)
+
+        # Initialize path if not present
+        if normalized_path not in config["xml_endpoints"]:
+            config["xml_endpoints"][normalized_path] = {"instances": []}
+
+        instances = config["xml_endpoints"][normalized_path]["instances"]
+
+        # Check for duplicate request-response pairs
+        digest = pair_digest(request_data, response_data)
+        digests = stored_pair_digests(normalized_path, instances)
+        if digest in digests:
+            return json_response({"status": "error", "message": "Duplicate request and response"}, 400)
+
+        # Generate unique ID for this registration
+        new_instance = {
+            "id": str(uuid.uuid4()),
+            "method": "POST",
+            "request": request_data,
+            "response": response_data,
+            "created_at": str(datetime.now())
+        }
+
+        # Store in config
+        instances.append(new_instance)
+        digests.add(digest)
+        write_config(config)
+
+        return json_response({"status": "success", "message": "XML endpoint registered successfully", "id": new_instance["id"]}, 200)
+    
+    except Exception as e:
+        return json_response({"status": "error", "message": str(e)}, 500)
+
+if __name__ == '__main__':
+    server_config = Config()
+    server_config.bind = ["127.0.0.1:5000"]
+    with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+        runner.run(serve(app, server_config))
@@ -0,0 +1,256 @@
+# XML endpoint simulator. Run: python xml_simulator.py (or hypercorn xml_simulator:app)
+import asyncio
+import atexit
+import copy
+import functools
+import hashlib
+import threading
+import uuid
+from datetime import datetime
+from quart import Quart, request, Response
+from werkzeug.exceptions import HTTPException
+from hypercorn.asyncio import serve
+from hypercorn.config import Config
+import orjson
+import uvloop
+import yaml
+import os
+import xmltodict
+
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeLoader, SafeDumper
+
+app = Quart(__name__)
+CONFIG_FILE = "config.xml.yaml"  # YAML file for storing XML data
+FLUSH_DELAY = 5.0  # Seconds to batch config writes before flushing them to disk
+DUMP_BUFFER_SIZE = 1 << 20  # Write buffer for config dumps, so a flush takes few write syscalls
+SUCCESS_XML = "<response><message>Success</message></response>"  # Example Response
+SUCCESS_XML_BYTES = SUCCESS_XML.encode("utf-8")
+
+# The config is parsed once and then lives in memory, with each path's instances
+# keyed by id; handlers only touch it on the event loop thread, and changes reach
+# disk (as plain instance lists) in batched flushes
+_config = None
+_flush_handle = None
+_flush_tasks = set()  # In-flight background dumps, kept referenced until they finish
+_flush_version = 0  # Bumped for every snapshot handed to dump_config
+_dumped_version = 0  # Version of the snapshot currently on disk
+_dump_lock = threading.Lock()
+_request_digests = {}  # Per-path digests of stored requests, dropped after an update or delete
+_response_bodies = {}  # Rendered XML reply per endpoint id, dropped when the endpoint is deleted
+
+def read_config():
+    global _config
+    if _config is None:
+        # A missing file is just an empty config; the first flush creates it
+        try:
+            with open(CONFIG_FILE, "r") as f:
+                config = yaml.load(f, Loader=SafeLoader) or {"xml_endpoints": {}}
+        except FileNotFoundError:
+            config = {"xml_endpoints": {}}
+        for entry in config["xml_endpoints"].values():
+            entry["instances"] = {instance["id"]: instance for instance in entry["instances"]}
+        _config = config
+    return _config
+
+def on_disk_config(config):
+    return {**config, "xml_endpoints": {
+        path: {**entry, "instances": list(entry["instances"].values())}
+        for path, entry in config["xml_endpoints"].items()
+    }}
+
+def write_config(config):
+    global _config, _flush_handle
+    _config = config
+    if _flush_handle is None:
+        _flush_handle = asyncio.get_running_loop().call_later(FLUSH_DELAY, _start_flush)
+
+def _start_flush():
+    global _flush_handle, _flush_version
+    _flush_handle = None
+    # Snapshot on the loop, where handlers mutate the config, then write it off the loop
+    _flush_version += 1
+    snapshot = copy.deepcopy(on_disk_config(_config))
+    task = asyncio.get_running_loop().create_task(asyncio.to_thread(dump_config, _flush_version, snapshot))
+    _flush_tasks.add(task)
+    task.add_done_callback(_flush_done)
+
+def _flush_done(task):
+    _flush_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        app.logger.error("Failed to write %s", CONFIG_FILE, exc_info=task.exception())
+
+def dump_config(version, config):
+    global _dumped_version
+    with _dump_lock:
+        # Dumps may reach the lock out of order; never let an older snapshot replace a newer one
+        if version <= _dumped_version:
+            return
+        tmp_file = CONFIG_FILE + ".tmp"
+        with open(tmp_file, "w", buffering=DUMP_BUFFER_SIZE) as f:
+            yaml.dump(config, f, Dumper=SafeDumper, default_flow_style=None)
+        os.replace(tmp_file, CONFIG_FILE)
+        _dumped_version = version
+
+def flush_config():
+    """Write any batched config changes to disk immediately."""
+    global _flush_handle, _flush_version
+    if _flush_handle is not None:
+        _flush_handle.cancel()
+        _flush_handle = None
+        _flush_version += 1
+        dump_config(_flush_version, on_disk_config(_config))
+
+app.after_serving(flush_config)
+atexit.register(flush_config)
+
+class JSONResponse(Response):
+    default_mimetype = "application/json"
+
+def json_response(payload, status):
+    return JSONResponse(orjson.dumps(payload), status=status)
+
+@functools.lru_cache(maxsize=4096)
+def normalize_path(path):
+    return '/' + path.strip('/')
+
+def request_digest(parsed_xml):
+    # Sorted-key JSON makes equal parsed documents, and only those, hash alike
+    return hashlib.blake2b(orjson.dumps(parsed_xml, option=orjson.OPT_SORT_KEYS), digest_size=16).digest()
+
+def stored_request_digests(path, instances):
+    digests = _request_digests.get(path)
+    if digests is None:
+        digests = _request_digests[path] = {request_digest(instance["request"]) for instance in instances.values()}
+    return digests
+
+@app.errorhandler(Exception)
+async def handle_unexpected_error(e):
+    # Keep the JSON error body for failures such as an unreadable config; routing errors pass through
+    if isinstance(e, HTTPException):
+        return e
+    return json_response({"status": "error", "message": str(e)}, 500)
+
+def parse_or_error(xml_data):
+    # expat decodes the raw bytes itself; only the parse needs guarding
+    if not xml_data:
+        return None, json_response({"status": "error", "message": "Empty XML data"}, 400)
+    try:
+        return xmltodict.parse(xml_data), None
+    except Exception as e:
+        return None, json_response({"status": "error", "message": f"Invalid XML format: {str(e)}"}, 400)
+
+@app.route('/xml-simulator/<path:path>', methods=['POST'])
+async def register_xml_endpoint(path):
+    """Registers a new XML endpoint."""
+    config = read_config()
+    normalized_path = normalize_path(path)
+    parsed_xml, error = parse_or_error(await request.get_data(cache=False))
+    if error is not None:
+        return error
+
+    if normalized_path not in config["xml_endpoints"]:
+        config["xml_endpoints"][normalized_path] = {"instances": {}}
+
+    instances = config["xml_endpoints"][normalized_path]["instances"]
+
+    # Duplicate check
+    digest = request_digest(parsed_xml)
+    digests = stored_request_digests(normalized_path, instances)
+    if digest in digests:
+        return json_response({"status": "error", "message": "Duplicate XML request"}, 400)
+
+    # Store new XML request-response pair
+    new_instance = {
+        "id": str(uuid.uuid4()),
+        "method": "POST",
+        "request": parsed_xml,
+        "response": SUCCESS_XML,
+        "created_at": str(datetime.now())
+    }
+    instances[new_instance["id"]] = new_instance
+    digests.add(digest)
+    write_config(config)
+
+    return Response(SUCCESS_XML_BYTES, mimetype="application/xml"), 200
+
+async def stream_endpoints(instances):
+    # One orjson chunk per instance, so the full reply is never built in memory
+    yield b'{"status":"success","endpoints":['
+    prefix = b''
+    for instance in instances:
+        yield prefix + orjson.dumps(instance)
+        prefix = b','
+    yield b']}'
+
+@app.route('/xml-simulator/<path:path>', methods=['GET'])
+async def get_all_xml_endpoints(path):
+    """Fetches all XML endpoints for a given path."""
+    config = read_config()
+    normalized_path = normalize_path(path)
+
+    if normalized_path in config["xml_endpoints"]:
+        instances = list(config["xml_endpoints"][normalized_path]["instances"].values())
+        return JSONResponse(stream_endpoints(instances), status=200)
+
+    return json_response({"status": "error", "message": "No endpoints found for the given path"}, 404)
+
+@app.route('/xml-simulator/<path:path>/<endpoint_id>', methods=['GET'])
+async def get_xml_endpoint(path, endpoint_id):
+    """Fetches a specific XML endpoint by ID."""
+    config = read_config()
+    normalized_path = normalize_path(path)
+
+    if normalized_path in config["xml_endpoints"]:
+        instance = config["xml_endpoints"][normalized_path]["instances"].get(endpoint_id)
+        if instance is not None:
+            body = _response_bodies.get(endpoint_id)
+            if body is None:
+                body = _response_bodies[endpoint_id] = xmltodict.unparse({"response": instance["response"]}).encode("utf-8")
+            return Response(body, mimetype="application/xml"), 200
+
+    return json_response({"status": "error", "message": "Endpoint not found"}, 404)
+
+@app.route('/xml-simulator/<path:path>/<endpoint_id>', methods=['PUT'])
+async def update_xml_endpoint(path, endpoint_id):
+    """Updates an existing XML endpoint."""
+    config = read_config()
+    normalized_path = normalize_path(path)
+    parsed_xml, error = parse_or_error(await request.get_data(cache=False))
+    if error is not None:
+        return error
+
+    if normalized_path in config["xml_endpoints"]:
+        instance = config["xml_endpoints"][normalized_path]["instances"].get(endpoint_id)
+        if instance is not None:
+            instance["request"] = parsed_xml
+            instance["updated_at"] = str(datetime.now())
+            _request_digests.pop(normalized_path, None)
+            write_config(config)
+            return json_response({"status": "success", "message": "Endpoint updated successfully"}, 200)
+
+    return json_response({"status": "error", "message": "Endpoint not found"}, 404)
+
+@app.route('/xml-simulator/<path:path>/<endpoint_id>', methods=['DELETE'])
+async def delete_xml_endpoint(path, endpoint_id):
+    """Deletes a specific XML endpoint."""
+    config = read_config()
+    normalized_path = normalize_path(path)
+
+    if normalized_path in config["xml_endpoints"]:
+        if config["xml_endpoints"][normalized_path]["instances"].pop(endpoint_id, None) is not None:
+            _request_digests.pop(normalized_path, None)
+            _response_bodies.pop(endpoint_id, None)
+            write_config(config)
+            return json_response({"status": "success", "message": "Endpoint deleted successfully"}, 200)
+
+    return json_response({"status": "error", "message": "Endpoint not found"}, 404)
+
+if __name__ == '__main__':
+    # Serve on an asyncio event loop, as app.py does, instead of a thread per request
+    server_config = Config()
+    server_config.bind = ["127.0.0.1:5000"]
+    with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+        runner.run(serve(app, server_config))